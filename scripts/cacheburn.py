@@ -2,12 +2,54 @@
 """Clean up cache files and directories."""
 
 import argparse
+import fnmatch
+import os
+import shutil
+import stat
+from typing import Callable
 from typing import List
+from typing import Text
 
 from library.classes import Environment
 from library.classes import Labels
 from library.utilities import min_python_version
-from library.utilities import run_one_command
+
+# Cache directory names to remove. Only directories are matched against
+# these; the file-only names (Icon? and desktop.ini) are never removed when
+# they're directories.
+CACHE_DIRS = {'__pycache__', '.pytest_cache', '.ipynb_checkpoints'}
+
+
+def remove(e: Environment,
+           path: str,
+           remover: Callable[[str], None]) -> Text:
+    """Remove a file or directory.
+
+    Parameters
+    ----------
+    e : Environment
+        All the environment variables saved as attributes in an
+        Environment object.
+    path : str
+        The file or directory to remove.
+    remover : Callable[[str], None]
+        The function that does the removal (for example, os.unlink for
+        files or shutil.rmtree for directories).
+
+    Returns
+    -------
+    Text
+        Returns a unicode string representing either a green checkmark
+        (PASS) or a red X (FAIL).
+    """
+    if e.DEBUG:
+        print(f'\nDeleting: {path}')
+        return e.PASS
+    try:
+        remover(path)
+    except OSError:
+        return e.FAIL
+    return e.PASS
 
 
 def burn_it_up(e: Environment) -> None:
@@ -26,30 +68,53 @@ def burn_it_up(e: Environment) -> None:
         Zapping pesky Icon files
         Crunching annoying desktop.ini files""")
 
-    # Start with cache directories:
+    # Everything is removed in a single walk of ~/shares, in-process, so no
+    # find or rm processes are needed. Cache directories are pruned from the
+    # walk (so it doesn't descend into them) and removed. Like find -type d
+    # and -type f, symbolic links are never followed or removed, and names
+    # are only matched against the right type: directories against
+    # CACHE_DIRS, and files against Icon? and desktop.ini. Each key in results
+    # matches a label, in order, and is only used for reporting.
 
-    # NOTE: If this command were being run on the command line, you'd need to
-    # escape the semicolon (\;)
     home = e.HOME/'shares'
-    base = f'find {home} -name DIR -type d -exec rm -rvf {{}} ; -prune'
-    commands: List[str] = []
-    commands.append(base.replace('DIR', '__pycache__'))
-    commands.append(base.replace('DIR', '.pytest_cache'))
-    commands.append(base.replace('DIR', '.ipynb_checkpoints'))
-    for cmd in commands:
-        labels.next()
-        print(run_one_command(e, cmd))
-
-    # Tee up files for deletion. You can sneak some other options in for the
-    # find command if necessary.
-
-    base = f'find {home} -name FILE -type f -delete'
-    commands = []
-    commands.append(base.replace('FILE', 'Icon? -size 0'))
-    commands.append(base.replace('FILE', 'desktop.ini'))
-    for cmd in commands:
+    results = dict.fromkeys(['__pycache__',
+                             '.pytest_cache',
+                             '.ipynb_checkpoints',
+                             'Icon?',
+                             'desktop.ini'], e.PASS)
+    errors: List[OSError] = []
+    for root, dirs, files in os.walk(home, onerror=errors.append):
+        for name in [d for d in dirs if d in CACHE_DIRS]:
+            dirs.remove(name)
+            path = os.path.join(root, name)
+            if not os.path.islink(path):
+                if remove(e, path, shutil.rmtree) == e.FAIL:
+                    results[name] = e.FAIL
+        for name in files:
+            path = os.path.join(root, name)
+            if name == 'desktop.ini':
+                key = name
+            elif fnmatch.fnmatchcase(name, 'Icon?'):
+                key = 'Icon?'
+            else:
+                continue
+            try:
+                info = os.lstat(path)
+            except OSError:
+                continue
+            if not stat.S_ISREG(info.st_mode):
+                continue
+            if key == 'Icon?' and info.st_size != 0:
+                continue
+            if remove(e, path, os.unlink) == e.FAIL:
+                results[key] = e.FAIL
+
+    # If the walk itself hit an error (for example, ~/shares is missing),
+    # flag every step like find would.
+
+    for key in results:
         labels.next()
-        print(run_one_command(e, cmd))
+        print(e.FAIL if errors else results[key])
 
     return
 
@@ -9,16 +9,21 @@ RuntimeError
 
 import argparse
 import getpass
+import os
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 from library.classes import Environment
 from library.classes import Labels
-from library.utilities import clean_str
 from library.utilities import clear
+from library.utilities import download_file
+from library.utilities import dpkg_arch
+from library.utilities import lsb_codename
 from library.utilities import min_python_version
-from library.utilities import run_many_arguments
+from library.utilities import run_batched_arguments
 from library.utilities import run_one_command
+from library.utilities import sudo_keepalive
 from library.utilities import wrap_tight
 
 
@@ -57,101 +62,134 @@ def run_script(e: Environment) -> None:
     # a label when providing status
 
     run_one_command(e, 'sudo ls')
+    sudo_keepalive(e)
 
     # ------------------------------------------
 
-    # Step 1: System initialization.
+    # Step 1: System initialization. Start downloading the Docker public key
+    # in the background so it overlaps with the apt work in steps 2 and 3.
+    # Only the download runs early; dearmoring the key needs the packages
+    # installed in step 3.
 
     labels.next()
     targets: List[str] = []
+    # The temp files are created up front with mkstemp and opened up to 644,
+    # since apt needs to read the installed keyring and repository list.
+    fd, temp1 = tempfile.mkstemp(suffix='.asc')
+    os.close(fd)
+    fd, temp2 = tempfile.mkstemp(suffix='.gpg')
+    os.fchmod(fd, 0o644)
+    os.close(fd)
+    keyloc = 'https://download.docker.com/linux/ubuntu/gpg'
+    executor = ThreadPoolExecutor(max_workers=1)
+    key_download = executor.submit(download_file, e, keyloc, temp1)
+
+    # Run apt non-interactively and without dpkg's pty progress layer, and
+    # don't list every upgraded package. This cuts down on terminal output
+    # while packages are installed.
+
+    apt_env = {'DEBIAN_FRONTEND': 'noninteractive'}
+    apt_opts = '-o Dpkg::Use-Pty=0 -o APT::Get::Show-Upgraded=false'
     print(e.PASS)
 
     # ------------------------------------------
 
-    # Step 2: Update package index
+    # Step 2: Update package index. Skip downloading translated package
+    # descriptions, since they aren't needed for a scripted install.
 
     labels.next()
     commands: List[str] = []
-    commands.append('sudo apt update')
-    commands.append('sudo apt upgrade -y')
+    commands.append('sudo apt update -o Acquire::Languages=none')
+    commands.append(f'sudo apt upgrade {apt_opts} -y')
     for command in commands:
-        run_one_command(e, command)
+        run_one_command(e, command, env=apt_env)
     print(e.PASS)
 
     # ------------------------------------------
 
-    # Step 3: Install dependencies
+    # Step 3: Install dependencies. Recommended packages are skipped here to
+    # cut down on download size. The Docker packages in steps 6 and 7 keep
+    # theirs: docker-ce-cli recommends docker-buildx-plugin (without it,
+    # docker build falls back to the deprecated legacy builder) and docker-ce
+    # recommends docker-ce-rootless-extras, pigz and xz-utils.
 
     labels.next()
-    cmd = 'sudo apt install TARGET -y'
+    cmd = f'sudo apt install --no-install-recommends {apt_opts} TARGET -y'
     targets.append('apt-transport-https')
     targets.append('ca-certificates')
     targets.append('curl')
     targets.append('gnupg-agent')
     targets.append('make')
     targets.append('software-properties-common')
-    print(run_many_arguments(e, cmd, targets))
-
-    # Step 4: Install Docker public key.
-
-    labels.next()
-    temp1 = f'{tempfile.NamedTemporaryFile().name}.asc'
-    temp2 = f'{tempfile.NamedTemporaryFile().name}.gpg'
-    keyloc = 'https://download.docker.com/linux/ubuntu/gpg'
-    dest = '/usr/share/keyrings/docker-archive-keyring.gpg'
-    cmd = f'curl -o {temp1} -fsSL {keyloc}'
-    result = run_one_command(e, cmd)
-    if result == e.PASS:
-        cmd = f'gpg -o {temp2} --dearmor {temp1}'
-        result = run_one_command(e, cmd)
+    print(run_batched_arguments(e, cmd, targets, env=apt_env))
+
+    # Step 4: Install Docker public key. Wait for the download started in
+    # step 1 to finish first. Steps 4 and 5 move their temp files into place
+    # when they succeed; anything still left in /tmp afterwards (after a
+    # failure, or in debug mode) is removed at the end of step 5.
+
+    temps: List[str] = [temp1, temp2]
+    try:
+        labels.next()
+        dest = '/usr/share/keyrings/docker-archive-keyring.gpg'
+        result = key_download.result()
+        executor.shutdown()
         if result == e.PASS:
-            cmd = f'sudo mv {temp2} {dest} -f'
+            cmd = f'gpg --yes -o {temp2} --dearmor {temp1}'
             result = run_one_command(e, cmd)
             if result == e.PASS:
-                cmd = f'rm {temp1} -f'
+                cmd = f'sudo mv {temp2} {dest} -f'
                 result = run_one_command(e, cmd)
-    print(result)
-
-    # ------------------------------------------
-
-    # Step 5: Map to the Docker repository. Again, special handling with
-    # subprocess because we're using pipes.
-
-    labels.next()
-    run_one_command(e, 'dpkg --print-architecture')
-    deb = f'deb [arch={clean_str(e.RESULT.stdout)} '
-    deb += 'signed-by=/usr/share/keyrings/docker-archive-keyring.gpg] '
-    deb += 'https://download.docker.com/linux/ubuntu '
-    run_one_command(e, 'lsb_release -cs')
-    deb += f'{clean_str(e.RESULT.stdout)} stable'
-    tempdest = f'{tempfile.NamedTemporaryFile().name}.list'
-    with open(tempdest, 'w') as f:
-        f.write(f'{deb}\n')
-    dest = '/etc/apt/sources.list.d/docker.list'
-    cmd = f'sudo mv {tempdest} {dest} -f'
-    print(run_one_command(e, cmd))
+        print(result)
+
+        # ------------------------------------------
+
+        # Step 5: Map to the Docker repository. The architecture and release
+        # codename are read from system files when possible.
+
+        labels.next()
+        deb = f'deb [arch={dpkg_arch(e)} '
+        deb += 'signed-by=/usr/share/keyrings/docker-archive-keyring.gpg] '
+        deb += 'https://download.docker.com/linux/ubuntu '
+        deb += f'{lsb_codename(e)} stable'
+        fd, tempdest = tempfile.mkstemp(suffix='.list')
+        temps.append(tempdest)
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, 'w') as f:
+            f.write(f'{deb}\n')
+        dest = '/etc/apt/sources.list.d/docker.list'
+        cmd = f'sudo mv {tempdest} {dest} -f'
+        print(run_one_command(e, cmd))
+    finally:
+        for temp in temps:
+            if os.path.exists(temp):
+                os.unlink(temp)
 
     # ------------------------------------------
 
-    # Step 6: Install Docker Engine
+    # Step 6: Install Docker Engine. The rest of the package index was just
+    # refreshed in step 2, so only update from the new Docker repository.
+    # Keep the other lists in place when doing so (List-Cleanup=0).
 
     labels.next()
-    cmd = 'sudo apt update'
-    result = run_one_command(e, cmd)
+    cmd = 'sudo apt update -o Acquire::Languages=none '
+    cmd += '-o Dir::Etc::sourcelist=sources.list.d/docker.list '
+    cmd += '-o Dir::Etc::sourceparts=- -o APT::Get::List-Cleanup=0'
+    result = run_one_command(e, cmd, env=apt_env)
     if result == e.PASS:
-        cmd = 'sudo apt install TARGET -y'
+        cmd = f'sudo apt install {apt_opts} TARGET -y'
         targets = []
         targets.append('docker-ce')
         targets.append('docker-ce-cli')
         targets.append('containerd.io')
-        result = run_many_arguments(e, cmd, targets)
+        result = run_batched_arguments(e, cmd, targets, env=apt_env)
     print(result)
 
     # Step 7: Install Docker Compose
 
     labels.next()
-    cmd = 'sudo apt install docker-compose-plugin -y'
-    print(run_one_command(e, cmd))
+    cmd = f'sudo apt install {apt_opts} docker-compose-plugin -y'
+    print(run_one_command(e, cmd, env=apt_env))
 
     # Step 8: Add user to docker group.
 
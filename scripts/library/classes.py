@@ -1,8 +1,36 @@
 #!/usr/bin/env python3
 """Support classes for ubuntu setup scripts."""
 
+import collections
 import sys
+import threading
 from pathlib import Path
+from typing import Any
+from typing import Deque
+
+# Paths in the repo for installation files. These are worked out once, when
+# this module is imported, so creating an Environment doesn't repeat the
+# lookups. Ubuntu is resolved in relation to this file (classes.py) to
+# facilitate debugging. The repo should still be cloned in ~ per the setup
+# instructions.
+
+_HOME = Path.home()
+_UBUNTU = Path(__file__).resolve().parents[2]
+_OHMYZSH = _HOME/'.oh-my-zsh'
+_SCRIPTS = _UBUNTU/'scripts'
+_SHELL = _UBUNTU/'shell'
+_SYSTEM = _UBUNTU/'system'
+_VIM = _UBUNTU/'vim'
+
+# Files and directories that more than one script copies to or from.
+
+_BASHRC = _HOME/'.bashrc'
+_ZSHRC = _HOME/'.zshrc'
+_NOTEBOOKSREPO = _HOME/'.notebooksrepo'
+_VIM_COLORS_DIR = _HOME/'.vim/colors'
+_VIM_COLORS_SRC = _VIM/'vimcolors/*'
+_VIMRC = _HOME/'.vimrc'
+_VIMRC_SRC = _VIM/'vimrc.txt'
 
 
 class Environment:
@@ -22,8 +50,11 @@ class Environment:
 
         # PASS and FAIL markers; flag for enabling debug mode; and an
         # environment variable to hold the result from running commands using
-        # sub-process. These results may be needed in future use cases.
+        # sub-process. These results may be needed in future use cases. The
+        # result is kept per-thread (see the RESULT property below), so
+        # commands run from worker threads don't clobber each other.
 
+        self._local = threading.local()
         GREEN = '\033[0;32;49m'
         RED = '\033[0;31;49m'
         COLOR_END = '\x1b[0m'
@@ -33,18 +64,41 @@ class Environment:
         self.DEBUG = False
         self.RESULT = None
 
-        # Paths in the repo for installation files.
+        # Paths in the repo for installation files (see above).
 
-        self.HOME = Path.home()
-        # Ubuntu is resolved in relation to this file (classes.py) to
-        # facilitate debugging. The repo should still be cloned in ~ per the
-        # setup instructions..
-        self.UBUNTU = Path(__file__).resolve().parents[2]
-        self.OHMYZSH = self.HOME/'.oh-my-zsh'
-        self.SCRIPTS = self.UBUNTU/'scripts'
-        self.SHELL = self.UBUNTU/'shell'
-        self.SYSTEM = self.UBUNTU/'system'
-        self.VIM = self.UBUNTU/'vim'
+        self.HOME = _HOME
+        self.UBUNTU = _UBUNTU
+        self.OHMYZSH = _OHMYZSH
+        self.SCRIPTS = _SCRIPTS
+        self.SHELL = _SHELL
+        self.SYSTEM = _SYSTEM
+        self.VIM = _VIM
+
+        # Shared file and directory targets (see above).
+
+        self.BASHRC = _BASHRC
+        self.ZSHRC = _ZSHRC
+        self.NOTEBOOKSREPO = _NOTEBOOKSREPO
+        self.VIM_COLORS_DIR = _VIM_COLORS_DIR
+        self.VIM_COLORS_SRC = _VIM_COLORS_SRC
+        self.VIMRC = _VIMRC
+        self.VIMRC_SRC = _VIMRC_SRC
+
+    @property
+    def RESULT(self) -> Any:
+        """Return the result of the last command run by this thread.
+
+        Returns
+        -------
+        Any
+            The CompletedProcess from the last command run in the
+            calling thread, or None if it hasn't run any commands.
+        """
+        return getattr(self._local, 'result', None)
+
+    @RESULT.setter
+    def RESULT(self, result: Any) -> None:
+        self._local.result = result
 
 
 class ExhaustedListError(Exception):
@@ -71,17 +125,24 @@ class Labels:
         ----------
         s : str
             This is a docstring that has one label per line, the
-            initializer will repackage it into a list, along with an int
+            initializer will repackage it into a deque, along with an int
             variable (pad) that represents the length of the longest
             label. This is used for justifying the output when printing.
         """
-        # The (t := token.strip()) part of the list comprehension below is
-        # python's assignment expression and takes care of any blank lines or
+        # The (t := token.strip()) part of the loop below is python's
+        # assignment expression and takes care of any blank lines or
         # leading/trailing whitespace in the docstring. It assigns
         # token.strip() to t then evaluates t. If t is an empty string, it
-        # evaluates to False otherwise it's True.
-        self.labels = [t for token in s.split('\n') if (t := token.strip())]
-        self.pad = len(max(self.labels, key=len)) + 3
+        # evaluates to False otherwise it's True. The longest label is tracked
+        # in the same pass. Labels are kept in a deque so they can be popped
+        # from the front without shifting the rest.
+        self.labels: Deque[str] = collections.deque()
+        longest = 0
+        for token in s.split('\n'):
+            if (t := token.strip()):
+                self.labels.append(t)
+                longest = max(longest, len(t))
+        self.pad = longest + 3
         return
 
     def next(self) -> None:
@@ -92,9 +153,7 @@ class Labels:
         ExhaustedListError
             If attempting to pop from an empty list.
         """
-        if len(self.labels) == 0:
-            raise ExhaustedListError()
-        print(f'{self.labels.pop(0):.<{self.pad}}', end='', flush=True)
+        print(f'{self.pop_first():.<{self.pad}}', end='', flush=True)
         return
 
     def pop_first(self) -> str:
@@ -112,7 +171,7 @@ class Labels:
         """
         if len(self.labels) == 0:
             raise ExhaustedListError()
-        return self.labels.pop(0)
+        return self.labels.popleft()
 
     def pop_last(self) -> str:
         """Pop and return the last label (position -1).
@@ -129,7 +188,7 @@ class Labels:
         """
         if len(self.labels) == 0:
             raise ExhaustedListError()
-        return self.labels.pop(-1)
+        return self.labels.pop()
 
     def pop_item(self, index: int) -> str:
         """Pop a label from a given index.
@@ -152,7 +211,8 @@ class Labels:
         if len(self.labels) == 0:
             raise ExhaustedListError()
         try:
-            label = self.labels.pop(index)
+            label = self.labels[index]
+            del self.labels[index]
             return label
         except IndexError as e:
             print(f'{e}. Attempting to pop index {index}.')
@@ -175,7 +235,8 @@ class Labels:
                 (num_labels <= 0) or (len(self.labels) < num_labels)):
             return
         else:
-            self.labels = self.labels[num_labels:]
+            for _ in range(num_labels):
+                self.labels.popleft()
         return
 
 
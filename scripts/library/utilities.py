@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Utilities for ubuntu scripts."""
 
+import glob
 import os
 import pathlib
 import shlex
@@ -8,6 +9,9 @@ import shutil
 import subprocess as sp
 import sys
 import textwrap
+import threading
+import time
+from typing import Dict
 from typing import List
 from typing import Text
 from typing import TextIO
@@ -16,14 +20,21 @@ from typing import Union
 
 from .classes import Environment
 
+# The most stderr (in bytes) kept from a captured command run through
+# subprocess.
+STDERR_TAIL = 64 * 1024
+
 
 def clear() -> None:
     """Clear the screen.
 
     This is an os-agnostic version, which will work with both Windows
-    and Linux.
+    and Linux. The ANSI escape sequences are written directly, instead
+    of launching a separate clear (or cls) program. The scrollback is
+    erased too, just like the clear command does.
     """
-    os.system('clear' if os.name == 'posix' else 'cls')
+    sys.stdout.write('\x1b[H\x1b[2J\x1b[3J')
+    sys.stdout.flush()
 
 
 def clean_str(bstr: bytes) -> Text:
@@ -68,10 +79,11 @@ def wrap_tight(msg: str, columns=70) -> str:
 
 
 def run_one_command(e: Environment,
-                    cmd: str,
+                    cmd: Union[str, List[str]],
                     capture: bool = True,
                     std_in: Union[TextIO, None] = None,
-                    std_out: Union[TextIO, None] = None) -> Text:
+                    std_out: Union[TextIO, None] = None,
+                    env: Union[Dict[str, str], None] = None) -> Text:
     """Run a single command in the shell.
 
     Parameters
@@ -79,9 +91,10 @@ def run_one_command(e: Environment,
     e : Environment
         All the environment variables saved as attributes in an
         Environment object.
-    cmd : str
+    cmd : str | list[str]
         A shell command (with potentially options) saved as a Python
-        string.
+        string, or a command that has already been split into a list of
+        arguments (which saves splitting it again).
     capture : bool, optional
         Determine if stdout should be suppressed (True) or displayed
         (False), by default True.
@@ -93,30 +106,83 @@ def run_one_command(e: Environment,
         If stdin needs to be redirected on the command line you can
         pass an open file descriptor here for that purpose, by default
         None.
+    env : dict[str, str] | None
+        Extra environment variables to set for the command, on top of
+        the current environment, by default None. For sudo commands,
+        these variables are also passed through sudo with
+        --preserve-env.
 
     Returns
     -------
     Text
         Returns a unicode string representing either a green checkmark
         (PASS) or a red X (FAIL).
+
+    Notes
+    -----
+    Plain captured commands keep all of their output in `e.RESULT`, so
+    callers can read it. When commands using sudo, redirection, or extra
+    environment variables are captured, their stdout is discarded and
+    only the last STDERR_TAIL bytes of stderr are kept (in
+    `e.RESULT.stderr`), so chatty commands like apt don't pile up output
+    in memory.
     """
+    args = cmd if isinstance(cmd, list) else shlex.split(cmd)
+    if env and args[0] == 'sudo':
+        args = [args[0], f'--preserve-env={",".join(env)}'] + args[1:]
     if e.DEBUG:
-        print(f'\nRunning: {shlex.split(cmd)}')
+        print(f'\nRunning: {args}')
         return e.PASS
+    elif (capture and std_in is None and std_out is None and env is None and
+            args[0] != 'sudo'):
+        e.RESULT = sp.run(args, capture_output=True)
     else:
-        e.RESULT = sp.run(shlex.split(cmd),
-                          capture_output=capture,
-                          stdin=std_in,
-                          stdout=std_out)
-        if e.RESULT.returncode != 0:
-            return e.FAIL
+        with sp.Popen(args,
+                      stdin=std_in,
+                      stdout=std_out or (sp.DEVNULL if capture else None),
+                      stderr=sp.PIPE if capture else None,
+                      env={**os.environ, **env} if env else None) as proc:
+            tail = None
+            if proc.stderr:
+                tail = b''
+                while (chunk := proc.stderr.read(STDERR_TAIL)):
+                    tail = (tail + chunk)[-STDERR_TAIL:]
+        e.RESULT = sp.CompletedProcess(args, proc.returncode, None, tail)
+    if e.RESULT.returncode != 0:
+        return e.FAIL
     return e.PASS
 
 
+def marker_index(cmd: str,
+                 marker: str) -> Union[Tuple[int, List[str]], None]:
+    """Split a command template and locate its replacement marker.
+
+    Parameters
+    ----------
+    cmd : str
+        A shell command (with potentially options) saved as a Python
+        string.
+    marker : str
+        A string representing the replacement marker in the command
+        string.
+
+    Returns
+    -------
+    tuple[int, list[str]] | None
+        If the marker appears exactly once, as a whole argument, return
+        its index along with the split command. Otherwise, return None.
+    """
+    args = shlex.split(cmd)
+    if [arg for arg in args if marker in arg] == [marker]:
+        return args.index(marker), args
+    return None
+
+
 def run_many_arguments(e: Environment,
                        cmd: str,
                        targets: List[str],
-                       marker: str = 'TARGET') -> Text:
+                       marker: str = 'TARGET',
+                       env: Union[Dict[str, str], None] = None) -> Text:
     """Run the same command with multiple arguments.
 
     Parameters
@@ -134,6 +200,9 @@ def run_many_arguments(e: Environment,
         A string representing the replacement marker in the command
         string. Every time the command is run, a new target will be put
         in place of the marker. By default 'TARGET'.
+    env : dict[str, str] | None
+        Extra environment variables to set for the command (see
+        run_one_command), by default None.
 
     Returns
     -------
@@ -141,17 +210,114 @@ def run_many_arguments(e: Environment,
         Returns a unicode string representing either a green checkmark
         (PASS) or a red X (FAIL).
     """
+    # When the marker is a whole argument by itself, split the command once
+    # and splice each (split) target into place. Otherwise, fall back to
+    # plain string replacement.
+    found = marker_index(cmd, marker)
     for target in targets:
-        result = run_one_command(e, cmd.replace(marker, target))
+        if found is None:
+            result = run_one_command(e, cmd.replace(marker, target), env=env)
+        else:
+            i, base = found
+            args = base[:i] + shlex.split(target) + base[i + 1:]
+            result = run_one_command(e, args, env=env)
         if result == e.FAIL:
             return result
     return result
 
 
+def run_batched_arguments(e: Environment,
+                          cmd: str,
+                          targets: List[str],
+                          marker: str = 'TARGET',
+                          env: Union[Dict[str, str], None] = None) -> Text:
+    """Run a command once with all arguments in a single invocation.
+
+    Use this instead of run_many_arguments for commands (like apt
+    install) that accept many arguments at once. This avoids paying the
+    startup and locking cost of the command for every target.
+
+    Parameters
+    ----------
+    e : Environment
+        All the environment variables saved as attributes in an
+        Environment object.
+    cmd : str
+        A shell command (with potentially options) saved as a Python
+        string.
+    targets : list[str]
+        A Python list of strings representing the arguments to be
+        passed to the command together.
+    marker : str, optional
+        A string representing the replacement marker in the command
+        string. All targets, separated by spaces, will be put in place
+        of the marker. By default 'TARGET'.
+    env : dict[str, str] | None
+        Extra environment variables to set for the command (see
+        run_one_command), by default None.
+
+    Returns
+    -------
+    Text
+        Returns a unicode string representing either a green checkmark
+        (PASS) or a red X (FAIL).
+    """
+    if (found := marker_index(cmd, marker)) is None:
+        arguments = ' '.join(shlex.quote(target) for target in targets)
+        return run_one_command(e, cmd.replace(marker, arguments), env=env)
+    i, base = found
+    return run_one_command(e, base[:i] + targets + base[i + 1:], env=env)
+
+
+def sudo_keepalive(e: Environment, interval: int = 60) -> None:
+    """Keep the cached sudo credentials from expiring.
+
+    Starts a background (daemon) thread that refreshes the sudo
+    timestamp every `interval` seconds, so long running steps (like an
+    apt upgrade) don't stop part way through to ask for the password
+    again. This should be called after sudo has been primed (with
+    something like 'sudo ls'). The thread stops if the credentials can
+    no longer be refreshed without a password, and ends with the
+    script.
+
+    Parameters
+    ----------
+    e : Environment
+        All the environment variables saved as attributes in an
+        Environment object.
+    interval : int, optional
+        The number of seconds between refreshes, by default 60.
+    """
+    if e.DEBUG:
+        print('\nStarting: sudo keepalive')
+        return
+
+    def refresh() -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                result = sp.run(['sudo', '-n', '-v'],
+                                stdin=sp.DEVNULL,
+                                stdout=sp.DEVNULL,
+                                stderr=sp.DEVNULL)
+            except OSError:
+                return
+            if result.returncode != 0:
+                return
+
+    threading.Thread(target=refresh, daemon=True).start()
+    return
+
+
 def copy_files(e: Environment,
                targets: List[Tuple[pathlib.Path, pathlib.Path]]) -> None:
     """Copy files from source to destination.
 
+    Sources may contain glob wildcards (*, ? or [...]). Files are copied
+    with their metadata; directories are copied recursively, merging
+    into any existing destination. If the destination is an existing
+    directory, sources are copied into it.
+
     Parameters
     ----------
     e : Environment
@@ -165,15 +331,88 @@ def copy_files(e: Environment,
         copy_from, copy_to = target[0], target[1]
         if e.DEBUG:
             print(f'\nCopying: {str(copy_from)}\nTo: {str(copy_to)}')
-        else:
-            if '*' in copy_from.name:
-                for file in copy_from.parent.resolve().glob(copy_from.name):
-                    shutil.copy(file, copy_to)
+            continue
+        sources = [str(copy_from)]
+        if glob.escape(copy_from.name) != copy_from.name:
+            sources = sorted(glob.glob(str(copy_from)))
+        for source in sources:
+            if os.path.isdir(source):
+                dest = copy_to
+                if copy_to.is_dir():
+                    dest = copy_to/os.path.basename(source)
+                shutil.copytree(source, dest, dirs_exist_ok=True)
             else:
-                shutil.copy(copy_from, copy_to)
+                shutil.copy2(source, copy_to)
     return
 
 
+def download_file(e: Environment, url: str, dest: str) -> Text:
+    """Download a file from a url.
+
+    The download is done in Python, without launching a separate
+    program, so it's safe to run from a worker thread alongside other
+    commands.
+
+    Parameters
+    ----------
+    e : Environment
+        All the environment variables saved as attributes in an
+        Environment object.
+    url : str
+        The url of the file to download.
+    dest : str
+        The path where the downloaded file will be saved.
+
+    Returns
+    -------
+    Text
+        Returns a unicode string representing either a green checkmark
+        (PASS) or a red X (FAIL).
+    """
+    if e.DEBUG:
+        print(f'\nDownloading: {url}\nTo: {dest}')
+        return e.PASS
+    # Imported here rather than at the top of the module, since it pulls in
+    # http.client and ssl, and only docker_setup downloads anything.
+    import urllib.request
+    try:
+        urllib.request.urlretrieve(url, dest)
+    except OSError:
+        return e.FAIL
+    return e.PASS
+
+
+def fetch_notebooks(e: Environment) -> Text:
+    """Fetch the latest jupyter notebooks.
+
+    The hidden repository (~/.notebooksrepo) acts as a persistent local
+    cache of the notebooks. If it's already a git repository, pull any
+    new commits into it. Otherwise, make a shallow, single-branch,
+    partial clone (--filter=blob:none), which keeps the number of bytes
+    downloaded to a minimum.
+
+    Parameters
+    ----------
+    e : Environment
+        All the environment variables saved as attributes in an
+        Environment object.
+
+    Returns
+    -------
+    Text
+        Returns a unicode string representing either a green checkmark
+        (PASS) or a red X (FAIL).
+    """
+    src = 'https://github.com/geozeke/notebooks.git'
+    dest = e.NOTEBOOKSREPO
+    if (dest/'.git').is_dir():
+        cmd = f'git -C {dest} pull'
+    else:
+        options = '--filter=blob:none --single-branch --depth 1'
+        cmd = f'git clone {options} {src} {dest}'
+    return run_one_command(e, cmd)
+
+
 def sync_notebooks(e: Environment) -> Text:
     """Synchronize jupyter notebooks.
 
@@ -198,7 +437,7 @@ def sync_notebooks(e: Environment) -> Text:
         Returns a unicode string representing either a green checkmark
         (PASS) or a red X (FAIL).
     """
-    src = f'{e.HOME}/.notebooksrepo/'
+    src = f'{e.NOTEBOOKSREPO}/'
     dest = f'{e.HOME}/notebooks'
     exclude = f'{e.SYSTEM}/rsync_exclude.txt'
     options = f'-rc --exclude-from={exclude} --delete --delete-excluded'
@@ -206,6 +445,66 @@ def sync_notebooks(e: Environment) -> Text:
     return run_one_command(e, cmd)
 
 
+def dpkg_arch(e: Environment) -> Text:
+    """Determine the native dpkg architecture.
+
+    Read the architecture from dpkg's database if it's there. Fall back
+    to asking dpkg directly if not.
+
+    Parameters
+    ----------
+    e : Environment
+        All the environment variables saved as attributes in an
+        Environment object.
+
+    Returns
+    -------
+    Text
+        The native architecture (for example, 'amd64'), or an empty
+        string if it can't be determined.
+    """
+    try:
+        with open('/var/lib/dpkg/arch', 'r') as f:
+            if (arch := f.readline().strip()):
+                return arch
+    except OSError:
+        pass
+    if run_one_command(e, 'dpkg --print-architecture') == e.PASS and e.RESULT:
+        return clean_str(e.RESULT.stdout)
+    return ''
+
+
+def lsb_codename(e: Environment) -> Text:
+    """Determine the codename of the installed distribution.
+
+    Parse /etc/os-release for the VERSION_CODENAME entry. Fall back to
+    lsb_release if the entry can't be found.
+
+    Parameters
+    ----------
+    e : Environment
+        All the environment variables saved as attributes in an
+        Environment object.
+
+    Returns
+    -------
+    Text
+        The distribution codename (for example, 'jammy'), or an empty
+        string if it can't be determined.
+    """
+    try:
+        with open('/etc/os-release', 'r') as f:
+            for line in f:
+                key, _, value = line.strip().partition('=')
+                if key == 'VERSION_CODENAME' and (value := value.strip('"')):
+                    return value
+    except OSError:
+        pass
+    if run_one_command(e, 'lsb_release -cs') == e.PASS and e.RESULT:
+        return clean_str(e.RESULT.stdout)
+    return ''
+
+
 def min_python_version(e: Environment) -> Union[Text, None]:
     """Determine if Python is at required min version.
 
@@ -222,8 +521,7 @@ def min_python_version(e: Environment) -> Union[Text, None]:
         return a string error message.
     """
     msg = f'Minimum required Python version is {e.MAJOR}.{e.MINOR}'
-    if ((sys.version_info.major < e.MAJOR) or
-       (sys.version_info.minor < e.MINOR)):
+    if sys.version_info < (e.MAJOR, e.MINOR):
         return msg
     return None
 
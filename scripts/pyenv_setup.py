@@ -14,8 +14,9 @@ from library.classes import Environment
 from library.classes import Labels
 from library.utilities import clear
 from library.utilities import min_python_version
-from library.utilities import run_many_arguments
+from library.utilities import run_batched_arguments
 from library.utilities import run_one_command
+from library.utilities import sudo_keepalive
 from library.utilities import wrap_tight
 
 
@@ -51,6 +52,7 @@ def run_script(e: Environment) -> None:
     # label when providing status
 
     run_one_command(e, 'sudo ls')
+    sudo_keepalive(e)
 
     # ------------------------------------------
 
@@ -65,15 +67,16 @@ def run_script(e: Environment) -> None:
     # Step 2: Updating package index
 
     labels.next()
-    cmd = 'sudo apt update'
+    cmd = 'sudo apt update -o Acquire::Languages=none'
     print(run_one_command(e, cmd))
 
     # ------------------------------------------
 
-    # Step 3: Checking dependencies
+    # Step 3: Checking dependencies. Skip recommended packages, since only
+    # the build dependencies themselves are needed.
 
     labels.next()
-    cmd = 'sudo apt install TARGET -y'
+    cmd = 'sudo apt install --no-install-recommends TARGET -y'
     targets: List[str] = []
     targets.append('make')
     targets.append('build-essential')
@@ -93,7 +96,7 @@ def run_script(e: Environment) -> None:
     targets.append('libffi-dev')
     targets.append('liblzma-dev')
     targets.append('git')
-    print(run_many_arguments(e, cmd, targets))
+    print(run_batched_arguments(e, cmd, targets))
 
     # ------------------------------------------
 
@@ -102,7 +105,8 @@ def run_script(e: Environment) -> None:
     labels.next()
     src = "https://github.com/pyenv/pyenv.git"
     dest = f"{e.HOME}/.pyenv"
-    cmd = f"git clone {src} {dest} --depth 1"
+    options = "--filter=blob:none --single-branch --depth 1"
+    cmd = f"git clone {options} {src} {dest}"
     print(run_one_command(e, cmd))
 
     # ------------------------------------------
@@ -110,16 +114,15 @@ def run_script(e: Environment) -> None:
     # Step 5: Adjusting shell environments
 
     labels.next()
-    src = f"{e.SHELL}/pyenvsupport.txt"
-    bash = f"{e.HOME}/.bashrc"
-    zsh = f"{e.HOME}/.zshrc"
+    support = e.SHELL/'pyenvsupport.txt'
+    rc_files = [e.BASHRC, e.ZSHRC]
     try:
-        with open(src, 'r') as f1:
-            with open(bash, 'a') as f2:
-                f2.write(f1.read())
-            f1.seek(0)
-            with open(zsh, 'a') as f2:
-                f2.write(f1.read())
+        # Read the support file once and append the same bytes to each of
+        # the shell configuration files.
+        data = support.read_bytes()
+        for rc_file in rc_files:
+            with open(rc_file, 'ab') as f:
+                f.write(data)
         print(e.PASS)
     except Exception:
         print(e.FAIL)
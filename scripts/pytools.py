@@ -8,7 +8,7 @@ from library.classes import Environment
 from library.classes import Labels
 from library.utilities import clear
 from library.utilities import min_python_version
-from library.utilities import run_one_command
+from library.utilities import run_batched_arguments
 from library.utilities import wrap_tight
 
 
@@ -25,9 +25,7 @@ def run_script(e: Environment) -> None:
 
     labels = Labels("""
         System initialization
-        Installing jupyter
-        Installing jupyter lab
-        Installing pytest""")
+        Installing jupyter, jupyter lab & pytest""")
 
     # Step 1. System initialization. Right now it's just a placeholder for
     # future capability.
@@ -35,16 +33,16 @@ def run_script(e: Environment) -> None:
     labels.next()
     print(e.PASS)
 
-    # Step 2, 3, 4 Install jupyter, jupyterlab & pytest
+    # Step 2: Install jupyter, jupyterlab & pytest. Do it in one pip run so
+    # the resolver only starts once and can fetch everything together.
 
-    base = 'pip3 install --upgrade TARGET'
-    commands: List[str] = []
-    commands.append(base.replace('TARGET', 'jupyter'))
-    commands.append(base.replace('TARGET', 'jupyterlab'))
-    commands.append(base.replace('TARGET', 'pytest'))
-    for cmd in commands:
-        labels.next()
-        print(run_one_command(e, cmd))
+    labels.next()
+    cmd = 'pip3 install --upgrade TARGET'
+    targets: List[str] = []
+    targets.append('jupyter')
+    targets.append('jupyterlab')
+    targets.append('pytest')
+    print(run_batched_arguments(e, cmd, targets))
 
     # Done
 
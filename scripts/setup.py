@@ -8,8 +8,11 @@ RuntimeError
 """
 
 import argparse
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
+from typing import Dict
 from typing import List
 from typing import Tuple
 
@@ -17,9 +20,12 @@ from library.classes import Environment
 from library.classes import Labels
 from library.utilities import clear
 from library.utilities import copy_files
+from library.utilities import fetch_notebooks
 from library.utilities import min_python_version
+from library.utilities import run_batched_arguments
 from library.utilities import run_many_arguments
 from library.utilities import run_one_command
+from library.utilities import sudo_keepalive
 from library.utilities import sync_notebooks
 from library.utilities import wrap_tight
 
@@ -77,13 +83,18 @@ def run_script(e: Environment) -> None:
 
     # ------------------------------------------
 
-    # Step 2: Create new directories
+    # Step 2: Create new directories. Parents are listed ahead of their
+    # children (.vim before .vim/colors), so each directory is made with a
+    # single mkdir call instead of failing first and backing up to create the
+    # missing parent. This is all done in-process; running mkdir -p would
+    # cost a process launch on top of the same system calls.
 
     labels.next()
-    dir_targets.append(e.HOME/'.vim/colors')
+    dir_targets.append(e.HOME/'.vim')
+    dir_targets.append(e.VIM_COLORS_DIR)
     dir_targets.append(e.HOME/'shares')
     dir_targets.append(e.HOME/'notebooks')
-    dir_targets.append(e.HOME/'.notebooksrepo')
+    dir_targets.append(e.NOTEBOOKSREPO)
     for target in dir_targets:
         if e.DEBUG:
             print(f'\nMaking: {str(target)}')
@@ -96,23 +107,24 @@ def run_script(e: Environment) -> None:
     # Step 3: Copy files
 
     labels.next()
-    file_targets.append((e.SHELL/'bashrc.txt', e.HOME/'.bashrc'))
-    file_targets.append((e.SHELL/'zshrc.txt', e.HOME/'.zshrc'))
+    file_targets.append((e.SHELL/'bashrc.txt', e.BASHRC))
+    file_targets.append((e.SHELL/'zshrc.txt', e.ZSHRC))
     file_targets.append((e.SHELL/'profile.txt', e.HOME/'.profile'))
     file_targets.append((e.SHELL/'profile.txt', e.HOME/'.zprofile'))
     file_targets.append((e.SHELL/'dircolors.txt', e.HOME/'.dircolors'))
-    file_targets.append((e.VIM/'vimrc.txt', e.HOME/'.vimrc'))
-    file_targets.append((e.VIM/'vimcolors/*', e.HOME/'.vim/colors'))
+    file_targets.append((e.VIMRC_SRC, e.VIMRC))
+    file_targets.append((e.VIM_COLORS_SRC, e.VIM_COLORS_DIR))
     copy_files(e, file_targets)
     print(e.PASS)
 
     # ------------------------------------------
 
     # Step 4: Adjust file permissions on scripts just to make sure they're
-    # correct. It may not be absolutely necessary, but it won't hurt.
+    # correct. It may not be absolutely necessary, but it won't hurt. The "+"
+    # terminator hands all the matches to a single chmod, like xargs.
 
     labels.next()
-    cmd = f'find {e.SCRIPTS} -name *.py -exec chmod 754 {{}} ;'
+    cmd = f'find {e.SCRIPTS} -name "*.py" -exec chmod 754 {{}} +'
     print(run_one_command(e, cmd))
 
     # ------------------------------------------
@@ -143,6 +155,29 @@ def run_script(e: Environment) -> None:
     # label when providing status
 
     run_one_command(e, 'sudo ls')
+    sudo_keepalive(e)
+
+    # ------------------------------------------
+
+    # Start the network downloads for steps 8 (oh-my-zsh), 13 (Google
+    # Chrome), and 14 (jupyter notebooks) now, so they overlap with each other
+    # and with the apt install in step 6. None of them depend on each other or
+    # on the packages being installed. Each step waits for its own download
+    # when its label comes up.
+
+    downloads = ThreadPoolExecutor(max_workers=3)
+    futures: Dict[str, Future] = {}
+
+    src = 'https://github.com/robbyrussell/oh-my-zsh.git'
+    cmd = f'git clone {src} {e.OHMYZSH} --depth 1'
+    futures['oh-my-zsh'] = downloads.submit(run_one_command, e, cmd)
+
+    google_deb = 'google-chrome-stable_current_amd64.deb'
+    src = f'https://dl.google.com/linux/direct/{google_deb}'
+    cmd = f'wget -O /tmp/{google_deb} {src}'
+    futures['chrome'] = downloads.submit(run_one_command, e, cmd)
+
+    futures['notebooks'] = downloads.submit(fetch_notebooks, e)
 
     # ------------------------------------------
 
@@ -152,11 +187,15 @@ def run_script(e: Environment) -> None:
     # certificate fixes at USNA. These can be deleted for future non-USNA
     # installations.
 
-    # Build tools
+    # All the packages for steps 6, 7, 8, 10, and 11 are installed here with
+    # a single apt run, so apt only has to start up and resolve dependencies
+    # once. Those later steps report the result of this install.
 
     labels.next()
     cmd = 'sudo apt -y install TARGET'
     targets = []
+
+    # Build tools
     targets.append('gnome-text-editor')
     targets.append('build-essential')
     targets.append('libnss3-tools')
@@ -165,30 +204,36 @@ def run_script(e: Environment) -> None:
     targets.append('ccache')
     targets.append('vim')
     targets.append('tree')
-    print(run_many_arguments(e, cmd, targets))
+
+    # Step 7: seahorse nautilus
+    targets.append('seahorse-nautilus')
+
+    # Step 8: zsh
+    targets.append('zsh')
+    targets.append('powerline')
+
+    # Steps 10 and 11: pip3 and python3 venv
+    targets.append('python3-pip')
+    targets.append('python3-venv')
+
+    apt_result = run_batched_arguments(e, cmd, targets)
+    print(apt_result)
 
     # ------------------------------------------
 
-    # Step-7: seahorse nautilus
+    # Step-7: seahorse nautilus (installed in step 6)
 
     labels.next()
-    do_this = cmd.replace('TARGET', 'seahorse-nautilus')
-    print(run_one_command(e, do_this))
+    print(apt_result)
 
     # ------------------------------------------
 
-    # Step-8: zsh. Also copy over the peter zsh theme.
+    # Step-8: zsh (installed in step 6). Also copy over the peter zsh theme.
 
     labels.next()
-    targets = []
-    targets.append('zsh')
-    targets.append('powerline')
-    result = run_many_arguments(e, cmd, targets)
+    result = apt_result
     if result == e.PASS:
-        src = 'https://github.com/robbyrussell/oh-my-zsh.git'
-        dest = e.HOME/'.oh-my-zsh'
-        cmd = f'git clone {src} {dest} --depth 1'
-        result = run_one_command(e, cmd)
+        result = futures['oh-my-zsh'].result()
     if result == e.PASS:
         src = e.SHELL/'peter.zsh-theme'
         dest = e.HOME/'.oh-my-zsh/custom/themes'
@@ -215,19 +260,17 @@ def run_script(e: Environment) -> None:
 
     # ------------------------------------------
 
-    # Step-10: pip3
+    # Step-10: pip3 (installed in step 6)
 
     labels.next()
-    cmd = 'sudo apt install -y python3-pip'
-    print(run_one_command(e, cmd))
+    print(apt_result)
 
     # ------------------------------------------
 
-    # Step-11: python3 venv
+    # Step-11: python3 venv (installed in step 6)
 
     labels.next()
-    cmd = 'sudo apt install -y python3-venv'
-    print(run_one_command(e, cmd))
+    print(apt_result)
 
     # ------------------------------------------
 
@@ -242,10 +285,7 @@ def run_script(e: Environment) -> None:
     # Step-13: Google Chrome
 
     labels.next()
-    google_deb = 'google-chrome-stable_current_amd64.deb'
-    src = f'https://dl.google.com/linux/direct/{google_deb}'
-    cmd = f'wget -O /tmp/{google_deb} {src}'
-    result = run_one_command(e, cmd)
+    result = futures['chrome'].result()
     if result == e.PASS:
         cmd = f'sudo dpkg -i /tmp/{google_deb}'
         result = run_one_command(e, cmd)
@@ -256,11 +296,8 @@ def run_script(e: Environment) -> None:
     # Step-14: Set up jupyter notebooks
 
     labels.next()
-    # Clone the notebook repo (single branch, depth 1)
-    src = 'https://github.com/geozeke/notebooks.git'
-    dest = e.HOME/'.notebooksrepo'
-    cmd = f'git clone {src} {dest} --single-branch --depth 1'
-    result = run_one_command(e, cmd)
+    result = futures['notebooks'].result()
+    downloads.shutdown()
     if result == e.PASS:
         result = sync_notebooks(e)
     print(result)
@@ -275,54 +312,49 @@ def run_script(e: Environment) -> None:
 
     # ------------------------------------------
 
-    # Step-16: Configure favorites. NOTE: To get the information needed for the
-    # code below, setup desired favorites, then run this command: gsettings get
+    # Step-16: Configure favorites. The settings for steps 16, 17, 18, and 21
+    # are all in one file, and they're written with a single dconf load, so
+    # gsettings doesn't have to start up (and load its schemas) for each key.
+    # Steps 17, 18, and 21 report the result of this load. Like the other
+    # profiles, this needs special handling because we're redirecting stdin.
+    # NOTE: To get the information needed for the favorites in the settings
+    # file, setup desired favorites, then run this command: gsettings get
     # org.gnome.shell favorite-apps
 
     labels.next()
-    cmd = 'gsettings set org.gnome.shell favorite-apps \"[\''
-    targets = []
-    targets.append('google-chrome.desktop')
-    targets.append('org.gnome.TextEditor.desktop')
-    targets.append('org.gnome.Terminal.desktop')
-    targets.append('org.gnome.Nautilus.desktop')
-    targets.append('org.gnome.Calculator.desktop')
-    targets.append('gnome-control-center.desktop')
-    targets.append('snap-store_ubuntu-software.desktop')
-    targets.append('org.gnome.seahorse.Application.desktop')
-    cmd += '\',\''.join(targets) + '\']\"'
-    print(run_one_command(e, cmd))
+    cmd = 'dconf load /'
+    path = e.SYSTEM/'gnome_settings.txt'
+    if e.DEBUG:
+        print(f'Opening: {path}')
+    with open(path, 'r') as f:
+        gnome_result = run_one_command(e, cmd, std_in=f)
+    print(gnome_result)
 
     # ------------------------------------------
 
-    # Step-17: Disable auto screen lock
+    # Step-17: Disable auto screen lock (set in step 16)
 
     labels.next()
-    cmd = 'gsettings set org.gnome.desktop.screensaver lock-enabled false'
-    print(run_one_command(e, cmd))
+    print(gnome_result)
 
     # ------------------------------------------
 
-    # Step-18: Set idle timeout to 'never'.
+    # Step-18: Set idle timeout to 'never' (set in step 16).
 
     labels.next()
-    cmd = 'gsettings set org.gnome.desktop.session idle-delay 0'
-    print(run_one_command(e, cmd))
+    print(gnome_result)
 
     # ------------------------------------------
 
-    # Step-19: Disable auto updates.
+    # Step-19: Disable auto updates. Both substitutions are made with one sed
+    # run, so the file is only rewritten once.
 
     labels.next()
     dest = '/etc/apt/apt.conf.d/20auto-upgrades'
-    argument = r's+Update-Package-Lists\ \"1\"+Update-Package-Lists\ \"0\"+'
-    cmd = f'sudo sed -i {argument} {dest}'
-    result = run_one_command(e, cmd)
-    if result == e.PASS:
-        argument = r's+Unattended-Upgrade\ \"1\"+Unattended-Upgrade\ \"0\"+'
-        cmd = f'sudo sed -i {argument} {dest}'
-        result = run_one_command(e, cmd)
-    print(result)
+    arg1 = r's+Update-Package-Lists\ \"1\"+Update-Package-Lists\ \"0\"+'
+    arg2 = r's+Unattended-Upgrade\ \"1\"+Unattended-Upgrade\ \"0\"+'
+    cmd = f'sudo sed -i -e {arg1} -e {arg2} {dest}'
+    print(run_one_command(e, cmd))
 
     # ------------------------------------------
 
@@ -338,17 +370,10 @@ def run_script(e: Environment) -> None:
 
     # ------------------------------------------
 
-    # Step 21: Arrange icons.
+    # Step 21: Arrange icons (set in step 16).
 
     labels.next()
-    base = 'org.gnome.shell.extensions.'
-    targets = []
-    targets.append(f'{base}dash-to-dock show-trash false')
-    targets.append(f'{base}dash-to-dock show-mounts false')
-    targets.append(f'{base}ding start-corner bottom-left')
-    targets.append(f'{base}ding show-trash true')
-    cmd = 'gsettings set TARGET'
-    print(run_many_arguments(e, cmd, targets))
+    print(gnome_result)
 
     # ------------------------------------------
 
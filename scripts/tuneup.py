@@ -9,10 +9,14 @@ RuntimeError
 
 import argparse
 from typing import List
+from typing import Set
 
 from library.classes import Environment
 from library.classes import Labels
+from library.utilities import clean_str
+from library.utilities import fetch_notebooks
 from library.utilities import min_python_version
+from library.utilities import run_batched_arguments
 from library.utilities import run_one_command
 from library.utilities import sync_notebooks
 from library.utilities import wrap_tight
@@ -32,22 +36,21 @@ def run_updates(args: argparse.Namespace, e: Environment) -> None:
     """
     labels = Labels("""
         Pulling updates to git repo
-        Scanning for updates to pip
-        Scanning for updates to jupyter
-        Scanning for updates to jupyter lab
-        Scanning for updates to pytest
+        Scanning for updates to pip packages
         Synchronizing jupyter notebooks""")
 
-    # Ubuntu updates (verbose)
+    # Ubuntu updates (verbose). The apt commands are chained in one root
+    # shell, so there's a single sudo invocation for all of them. They're
+    # separated with ';' rather than '&&' so, as before, every command runs
+    # even if an earlier one reports an error.
 
-    commands: List[str] = []
-    commands.append('sudo apt update')
-    commands.append('sudo apt upgrade -y')
-    commands.append('sudo apt autoclean -y')
-    commands.append('sudo apt autoremove -y')
-    commands.append('sudo snap refresh')
-    for cmd in commands:
-        run_one_command(e, cmd, capture=False)
+    apts: List[str] = []
+    apts.append('apt update')
+    apts.append('apt upgrade -y')
+    apts.append('apt autoclean -y')
+    apts.append('apt autoremove -y')
+    run_one_command(e, ['sudo', 'sh', '-c', '; '.join(apts)], capture=False)
+    run_one_command(e, 'sudo snap refresh', capture=False)
 
     # Perform additional updates if -a is selected
 
@@ -61,26 +64,46 @@ def run_updates(args: argparse.Namespace, e: Environment) -> None:
         cmd = f'git -C {e.UBUNTU} pull'
         print(run_one_command(e, cmd))
 
-        # Update selected Python packages. Start with pip itself to ensure
+        # Update selected Python packages. Get the names of all installed
+        # packages with one pip run, rather than checking for each package
+        # separately. Start by upgrading pip itself, on its own, to ensure
         # we've got the lastest version of the Python package installer.
+        # Then upgrade the rest of the ones that are installed with one more
+        # pip run (using the new pip), so the resolver only has to work
+        # through them once.
         pips: List[str] = []
         pips.append('pip')
         pips.append('jupyter')
         pips.append('jupyterlab')
         pips.append('pytest')
-        for pip in pips:
-            pip_test = f'pip3 show {pip}'
-            if run_one_command(e, pip_test) == e.PASS:
-                labels.next()
-                cmd = f'pip3 install --upgrade {pip}'
-                print(run_one_command(e, cmd))
-            else:  # Dump the label if the package is not installed
-                labels.pop_first()
+        # In debug mode pip3 list doesn't run, so treat every package as
+        # installed to still show the upgrade commands.
+        installed: Set[str] = set()
+        cmd = 'pip3 list --format=freeze'
+        result = run_one_command(e, cmd)
+        if e.DEBUG:
+            installed.update(pips)
+        elif result == e.PASS and e.RESULT:
+            for line in clean_str(e.RESULT.stdout).splitlines():
+                name, _, _ = line.partition('==')
+                installed.add(name.strip().lower().replace('_', '-'))
+        to_upgrade = [pip for pip in pips if pip in installed]
+        if to_upgrade:
+            labels.next()
+            result = e.PASS
+            if 'pip' in to_upgrade:
+                result = run_one_command(e, 'pip3 install --upgrade pip')
+                to_upgrade.remove('pip')
+            if result == e.PASS and to_upgrade:
+                cmd = 'pip3 install --upgrade TARGET'
+                result = run_batched_arguments(e, cmd, to_upgrade)
+            print(result)
+        else:  # Dump the label if none of the packages are installed
+            labels.pop_first()
 
         # Sync jupyter notebooks
         labels.next()
-        cmd = f'git -C {e.HOME}/.notebooksrepo pull'
-        result = run_one_command(e, cmd)
+        result = fetch_notebooks(e)
         if result == e.PASS:
             result = sync_notebooks(e)
         print(result)
@@ -8,9 +8,16 @@ RuntimeError
 """
 
 import argparse
+import fnmatch
+import os
+import shlex
+import shutil
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from pathlib import Path
 from typing import List
+from typing import Text
 
 from library.classes import Environment
 from library.classes import Labels
@@ -18,16 +25,23 @@ from library.utilities import clear
 from library.utilities import min_python_version
 from library.utilities import run_many_arguments
 from library.utilities import run_one_command
+from library.utilities import sudo_keepalive
 from library.utilities import wrap_tight
 
 CERTFILE = 'apt.cs.usna.edu/ssl/system-certs-5.6-pa.tgz'
 
+# Directories that never hold certificate databases, but can be large. They
+# are skipped when searching for databases.
+SKIP_DIRS = {'.cache', '.git', 'Trash', 'cache', 'logs', 'node_modules',
+             'storage'}
+
 
 def find_db_files(starting: Path) -> List[Path]:
     """Find certificate db files.
 
     In this case, a certificate db file is any file that starts with
-    'cert*' and has a '.db' extension.
+    'cert*' and has a '.db' extension. Directories named in SKIP_DIRS
+    are not searched.
 
     Parameters
     ----------
@@ -40,13 +54,52 @@ def find_db_files(starting: Path) -> List[Path]:
         A list of fully-expressed pathlib objects for all db instances
         found.
     """
+    # Walking top-down lets the skipped directories be pruned from dirs, so
+    # the walk never descends into them. Only matching files are turned
+    # into Path objects.
     L: List[Path] = []
-    for p in starting.rglob('*'):
-        if p.name.startswith('cert') and p.suffix == '.db':
-            L.append(p)
+    for root, dirs, files in os.walk(starting):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for name in fnmatch.filter(files, 'cert*.db'):
+            L.append(Path(root, name))
     return L
 
 
+def apply_certs_to_db(e: Environment,
+                      db_dir: Path,
+                      certlist: List[Path]) -> Text:
+    """Add certificates to the certificate db in a directory.
+
+    All the certutil calls for the directory are chained in a single
+    shell, which stops at the first failure.
+
+    Parameters
+    ----------
+    e : Environment
+        All the environment variables saved as attributes in an
+        Environment object.
+    db_dir : Path
+        The directory holding the certificate db to update (certutil
+        works on a directory, not a single db file).
+    certlist : List[Path]
+        The certificates to add to the db.
+
+    Returns
+    -------
+    Text
+        Returns a unicode string representing either a green checkmark
+        (PASS) or a red X (FAIL).
+    """
+    adds: List[str] = []
+    for cert in certlist:
+        adds.append(shlex.join(['certutil', '-d', f'sql:{db_dir}',
+                                '-A', '-t', 'TC', '-n', cert.stem,
+                                '-i', str(cert)]))
+    if not adds:
+        return e.PASS
+    return run_one_command(e, ['sh', '-c', ' && '.join(adds)])
+
+
 def run_script(args: argparse.Namespace, e: Environment) -> None:
     """Patch openssl configuration and run certificate scripts.
 
@@ -86,6 +139,7 @@ def run_script(args: argparse.Namespace, e: Environment) -> None:
     # command. This will avoid having the password prompt come in the middle of
     # a label when providing status
     run_one_command(e, 'sudo ls')
+    sudo_keepalive(e)
 
     # ------------------------------------------
 
@@ -93,9 +147,8 @@ def run_script(args: argparse.Namespace, e: Environment) -> None:
     # server.
 
     labels.next()
-    certdir = Path(tempfile.NamedTemporaryFile().name)
+    certdir = Path(tempfile.mkdtemp(prefix='usnapatch_'))
     certlist: List[Path] = []
-    certdir.mkdir(parents=True)
     commands: List[str] = []
     commands.append(f'curl -o {certdir}/certs.tgz {CERTFILE}')
     commands.append(f'tar -xpf {certdir}/certs.tgz -C {certdir}')
@@ -107,7 +160,7 @@ def run_script(args: argparse.Namespace, e: Environment) -> None:
     # Create a list of all the full pathnames for the certificates
     if result == e.PASS:
         for p in certdir.iterdir():
-            if p.is_file and p.suffix == '.crt':
+            if p.is_file() and p.suffix == '.crt':
                 certlist.append(p)
 
     print(result)
@@ -140,11 +193,9 @@ def run_script(args: argparse.Namespace, e: Environment) -> None:
 
         # Copy certificates to new directory
         labels.next()
-        for cert in certlist:
-            cmd = f'sudo cp {cert} {dir2}'
-            result = run_one_command(e, cmd)
-            if result == e.FAIL:
-                break
+        if certlist:
+            copy_cmd = ['sudo', 'cp', '-t', dir2] + [str(p) for p in certlist]
+            result = run_one_command(e, copy_cmd)
         print(result)
 
         # Run the update utility
@@ -160,28 +211,42 @@ def run_script(args: argparse.Namespace, e: Environment) -> None:
         labels.dump(5)
 
         # From the user's home directory, look for certificate database
-        # files inside any hidden directory (starting with '.')
+        # files inside any hidden directory (starting with '.'). Using
+        # os.scandir lets the directory check come from the listing itself,
+        # rather than a separate stat for every entry in the home directory.
         labels.next()
         cert_databases: List[Path] = []
-        for p in Path.home().iterdir():
-            if p.is_dir and p.name.startswith('.'):
-                cert_databases += find_db_files(p)
+        with os.scandir(e.HOME) as entries:
+            hidden_dirs = [Path(entry.path) for entry in entries
+                           if entry.name.startswith('.') and
+                           entry.name not in SKIP_DIRS and
+                           entry.is_dir(follow_symlinks=False)]
+        for p in hidden_dirs:
+            cert_databases += find_db_files(p)
         print(e.PASS)
 
         # Once any / all certificate databases are found, update them with
         # the certutil utility using the certificates taken from the USNA
-        # server.
+        # server. certutil updates a whole directory, and one directory can
+        # hold more than one db file (for example, cert8.db and cert9.db in a
+        # migrated Firefox profile), so each directory is only updated once.
+        # Different directories are independent of each other, so they're
+        # updated in parallel. On the first failure, any updates that haven't
+        # started yet are cancelled.
         labels.next()
         result = e.PASS
-        for db in cert_databases:
-            cmd_root = f'certutil -d sql:{db.parent} -A -t \"TC\"'
-            for cert in certlist:
-                cmd = f'{cmd_root} -n {cert.stem} -i {cert}'
-                result = run_one_command(e, cmd)
-                if result == e.FAIL:
-                    break
-            if result == e.FAIL:
-                break
+        db_dirs = list(dict.fromkeys(db.parent for db in cert_databases))
+        if db_dirs:
+            workers = min(8, len(db_dirs))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(apply_certs_to_db, e, d, certlist)
+                           for d in db_dirs]
+                for future in as_completed(futures):
+                    if future.result() == e.FAIL:
+                        result = e.FAIL
+                        for f in futures:
+                            f.cancel()
+                        break
         print(result)
 
     else:
@@ -192,8 +257,10 @@ def run_script(args: argparse.Namespace, e: Environment) -> None:
     # Step 3: Cleanup temporary directories
 
     labels.next()
-    cmd = f'rm -rf {certdir}'
-    print(run_one_command(e, cmd))
+    if e.DEBUG:
+        print(f'\nDeleting: {certdir}')
+    shutil.rmtree(certdir, ignore_errors=True)
+    print(e.PASS)
 
     # ------------------------------------------
 
@@ -39,7 +39,7 @@ def run_script(e: Environment) -> None:
     # Step 2. Creating new directory
 
     labels.next()
-    p = e.HOME/'.vim/colors'
+    p = e.VIM_COLORS_DIR
     if e.DEBUG:
         print(p)
     else:
@@ -50,8 +50,8 @@ def run_script(e: Environment) -> None:
 
     labels.next()
     targets: List[Tuple[Any, Any]] = []
-    targets.append((e.VIM/'vimrc.txt', e.HOME/'.vimrc'))
-    targets.append((e.VIM/'vimcolors/*', e.HOME/'.vim/colors'))
+    targets.append((e.VIMRC_SRC, e.VIMRC))
+    targets.append((e.VIM_COLORS_SRC, e.VIM_COLORS_DIR))
     copy_files(e, targets)
     print(e.PASS)
 